@@ -1,9 +1,72 @@
-from fastapi import Depends, HTTPException, status
+import hashlib
+import math
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import APIKeyHeader
+from jose import JWTError, jwt
+
 from app.core.config import settings
+from app.core.ratelimit import InMemoryBackend, Limiter, RedisBackend
 
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 async def verify_api_key(api_key: str = Depends(api_key_header)):
     if api_key != settings.api_key:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API Key")
+
+
+# Rate-Limiting (cheap / kpi / bulk)
+
+_backend = (
+    RedisBackend(settings.rate_limit_redis_url)
+    if settings.rate_limit_redis_url
+    else InMemoryBackend()
+)
+
+limiters = {
+    name: Limiter(
+        name,
+        _backend,
+        rate=getattr(settings, f"rate_limit_{name}_rate"),
+        burst=getattr(settings, f"rate_limit_{name}_burst"),
+        concurrency=getattr(settings, f"rate_limit_{name}_concurrency"),
+    )
+    for name in ("cheap", "kpi", "bulk")
+}
+
+
+def client_id(request: Request) -> str:
+    """
+    Identifiziert den Aufrufer: JWT-User, sonst API-Key (gehasht), sonst IP.
+    """
+    auth = request.headers.get("Authorization", "")
+    if auth.startswith("Bearer "):
+        try:
+            sub = jwt.decode(auth[7:], settings.jwt_secret, algorithms=["HS256"]).get("sub")
+            if sub:
+                return f"user:{sub}"
+        except JWTError:
+            pass
+    key = request.headers.get("X-API-Key")
+    if key:
+        return "key:" + hashlib.sha256(key.encode()).hexdigest()[:16]
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def rate_limit(endpoint_class: str):
+    limiter = limiters[endpoint_class]
+
+    async def dependency(request: Request):
+        retry_after = await limiter.acquire(client_id(request))
+        if retry_after is not None:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded ({endpoint_class})",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    return dependency
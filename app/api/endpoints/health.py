@@ -1,6 +1,35 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response, status
+
+from app.core.config import settings
+from app.core.readiness import ReadinessProbe
+from app.db.session import engine
+from app.schemas.health import Readiness
+
 router = APIRouter(tags=["Health"])
 
+probe = ReadinessProbe(
+    engine,
+    ttl=settings.health_cache_ttl,
+    timeout=settings.health_db_timeout,
+    saturation_max=settings.health_pool_saturation_max,
+)
+
+
 @router.get("/health")
 def health():
     return {"status": "ok"}
+
+
+# Liveness: Prozess lebt – bewusst ohne DB-Zugriff
+@router.get("/health/live")
+def health_live():
+    return {"status": "ok"}
+
+
+# Readiness: DB erreichbar (gecached), Pool nicht ausgelastet, Rollup-Rückstand
+@router.get("/health/ready", response_model=Readiness)
+async def health_ready(response: Response):
+    report = await probe.report()
+    if report.status != "ok":
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return report
@@ -1,15 +1,16 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import latency
 from app.db import models
 from app.db.session import get_session
-from app.schemas.kpi import KPI, KPIEntry
+from app.schemas.kpi import KPI, KPIEntry, LatencyKPI
 
 router = APIRouter(prefix="/kpi", tags=["KPIs"])
 
@@ -31,6 +32,7 @@ def _partner_filter(
     partner_id: int | None,
     partner_name: str | None,
     partner_identifier: str | None,
+    column=models.Transaction.partner_id,
 ):
     """
     Ergänzt das Statement um einen Partner-Filter
@@ -45,7 +47,7 @@ def _partner_filter(
 
     # nach ID filtern
     if partner_id:
-        return stmt.where(models.Transaction.partner_id == partner_id)
+        return stmt.where(column == partner_id)
 
     # nach Name oder Identifier filtern
     if partner_name or partner_identifier:
@@ -54,7 +56,7 @@ def _partner_filter(
             subq = subq.where(models.Partner.name.ilike(f"%{partner_name}%"))
         else:
             subq = subq.where(models.Partner.identifier == partner_identifier)
-        return stmt.where(models.Transaction.partner_id.in_(subq))
+        return stmt.where(column.in_(subq))
 
     # kein Filter
     return stmt
@@ -184,3 +186,46 @@ async def kpi_error_rate(
         period_start=start_date,
         period_end=end_date,
     )
+
+
+# KPI: Latenz-Perzentile (aus stündlichen DDSketches)
+
+@router.get("/latency", response_model=List[LatencyKPI])
+async def kpi_latency(
+    metric: Literal["final_status", "desadv_after_delfor"] = latency.FINAL_STATUS,
+    message_type: str | None = None,
+    partner_id: int | None = None,
+    partner_name: str | None = None,
+    partner_identifier: str | None = None,
+    start_date: datetime | None = Query(None, alias="from"),
+    end_date: datetime | None = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_session),
+):
+    start_date, end_date = _default_dates(start_date, end_date)
+    ls = models.LatencySketch
+
+    # Auflösung ist die Stunde: angebrochene Randstunden zählen voll mit
+    stmt = select(ls).where(
+        ls.metric == metric,
+        ls.bucket_start >= latency.hour_floor(start_date),
+        ls.bucket_start <= end_date,
+    )
+    if message_type:
+        stmt = stmt.where(ls.message_type == message_type)
+    stmt = _partner_filter(stmt, partner_id, partner_name, partner_identifier, ls.partner_id)
+
+    rows = await latency.load_percentiles(db, stmt, (0.5, 0.95, 0.99))
+    return [
+        LatencyKPI(
+            partner_id=pid,
+            message_type=mt,
+            metric=m,
+            count=count,
+            p50=p50,
+            p95=p95,
+            p99=p99,
+            period_start=start_date,
+            period_end=end_date,
+        )
+        for pid, mt, m, count, (p50, p95, p99) in rows
+    ]
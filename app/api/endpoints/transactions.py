@@ -1,8 +1,13 @@
+import asyncio
+import re
 from datetime import datetime
-from typing import Optional, List
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, and_
+from typing import Literal, Optional, List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, and_, union
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+from app.core.config import settings
 from app.db.session import get_session
 from app.db import models
 from app.schemas.transaction import TransactionOut
@@ -42,3 +47,86 @@ async def list_transactions(
 async def list_errors(db: AsyncSession = Depends(get_session)):
     res = await db.execute(select(models.Transaction).where(models.Transaction.status != 40))
     return res.scalars().all()
+
+
+# Suche (Referenznummer-Präfix / Volltext in error_message)
+
+MYSQL_QUERY_INTERRUPTED = 3024  # ER_QUERY_TIMEOUT (MAX_EXECUTION_TIME überschritten)
+
+def fulltext_query(q: str) -> str:
+    """
+    Baut aus Freitext eine MySQL-Boolean-Mode-Query: jedes Wort muss
+    vorkommen, als Präfix. Operatoren aus der Eingabe werden verworfen.
+    """
+    return " ".join(f"+{word}*" for word in re.findall(r"\w+", q))
+
+
+def build_search(
+    q: str,
+    field: str,
+    partner_id: int | None,
+    start_date: datetime | None,
+    end_date: datetime | None,
+    limit: int,
+    offset: int,
+    budget_ms: int,
+):
+    t = models.Transaction
+    filters = []
+    if partner_id:
+        filters.append(t.partner_id == partner_id)
+    if start_date:
+        filters.append(t.created_at >= start_date)
+    if end_date:
+        filters.append(t.created_at <= end_date)
+
+    # je Suchfeld eine eigene, indexgestützte Teilabfrage – ein OR würde beide Indizes aushebeln
+    parts = []
+    if field in ("all", "reference"):
+        # Muster als fertiger String, damit MySQL einen Range-Scan auf dem Index macht
+        pattern = re.sub(r"([/%_])", r"/\1", q) + "%"
+        parts.append(select(t.id).where(t.reference_number.like(pattern, escape="/"), *filters))
+    terms = fulltext_query(q)
+    if field in ("all", "error") and terms:
+        parts.append(select(t.id).where(t.error_message.match(terms), *filters))
+    if not parts:
+        return None
+
+    ids = (union(*parts) if len(parts) > 1 else parts[0]).subquery()
+    return (
+        select(t)
+        .prefix_with(f"/*+ MAX_EXECUTION_TIME({budget_ms}) */", dialect="mysql")
+        .options(defer(t.content))
+        .where(t.id.in_(select(ids.c.id)))
+        .order_by(t.created_at.desc(), t.id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+
+
+@router.get("/search", response_model=List[TransactionOut])
+async def search_transactions(
+    q: str = Query(..., min_length=2, max_length=100),
+    field: Literal["all", "reference", "error"] = "all",
+    partner_id: Optional[int] = None,
+    start_date: Optional[datetime] = Query(None, alias="from"),
+    end_date: Optional[datetime] = Query(None, alias="to"),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0, le=10_000),
+    db: AsyncSession = Depends(get_session),
+):
+    budget_ms = settings.search_time_budget_ms
+    stmt = build_search(q, field, partner_id, start_date, end_date, limit, offset, budget_ms)
+    if stmt is None:
+        return []
+
+    # MySQL bricht per MAX_EXECUTION_TIME ab; wait_for greift zusätzlich clientseitig
+    try:
+        res = await asyncio.wait_for(db.execute(stmt), budget_ms / 1000 + 0.5)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Suche hat das Zeitbudget überschritten")
+    except OperationalError as exc:
+        if exc.orig.args[:1] != (MYSQL_QUERY_INTERRUPTED,):
+            raise
+        raise HTTPException(status_code=504, detail="Suche hat das Zeitbudget überschritten")
+    return res.scalars().all()
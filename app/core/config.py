@@ -4,6 +4,32 @@ class Settings(BaseSettings):
     api_key: str = "supersecret"
     database_url: str
     jwt_secret: str = "dev-secret" 
+
+    # Readiness-Probe: DB-Ergebnis wird pro Worker so lange wiederverwendet
+    health_cache_ttl: float = 5.0
+    health_db_timeout: float = 1.0
+    health_pool_saturation_max: float = 0.9
+
+    # Intervall des Hintergrund-Refreshs der Latenz-Sketches (Sekunden)
+    latency_refresh_interval: float = 60.0
+    # Überlappung des Änderungs-Scans mit dem vorherigen Lauf (Minuten)
+    latency_refresh_overlap_minutes: int = 10
+
+    # Rate-Limits pro Client (Token/Sekunde, Burst) und parallele Requests pro Worker
+    rate_limit_redis_url: str | None = None  # gesetzt -> Buckets über alle Worker geteilt
+    rate_limit_cheap_rate: float = 20.0
+    rate_limit_cheap_burst: int = 60
+    rate_limit_cheap_concurrency: int = 50
+    rate_limit_kpi_rate: float = 2.0
+    rate_limit_kpi_burst: int = 10
+    rate_limit_kpi_concurrency: int = 8
+    rate_limit_bulk_rate: float = 0.5
+    rate_limit_bulk_burst: int = 5
+    rate_limit_bulk_concurrency: int = 3
+
+    # Zeitbudget pro Transaktionssuche (Millisekunden)
+    search_time_budget_ms: int = 2000
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 settings = Settings()  # type: ignore
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from loguru import logger
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.core.readiness import register_lag_source
+from app.core.sketch import DDSketch
+from app.db import models
+
+# Metriken
+FINAL_STATUS = "final_status"  # updated_at - created_at
+DESADV_AFTER_DELFOR = "desadv_after_delfor"  # DESADV.created_at - letzter DELFOR.created_at
+METRICS = (FINAL_STATUS, DESADV_AFTER_DELFOR)
+
+RELATIVE_ACCURACY = 0.01
+ROLLUP_NAME = "latency_sketches"
+LOCK_NAME = "latency_refresh"
+
+# Startzeit des letzten erfolgreichen Refresh-Laufs (Wasserzeichen)
+_last_refresh: datetime | None = None
+
+
+def hour_floor(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def refresh_lag() -> float | None:
+    if _last_refresh is None:
+        return None
+    return round((datetime.utcnow() - _last_refresh).total_seconds(), 1)
+
+
+register_lag_source(ROLLUP_NAME, refresh_lag)
+
+
+# Hilfsfunktionen
+
+async def _dirty_hours(db: AsyncSession, since: datetime | None) -> set[datetime]:
+    """Stunden-Buckets, deren Transaktionen seit ``since`` angelegt/geändert wurden."""
+    t = models.Transaction
+    stmt = select(t.created_at)
+    if since is not None:
+        stmt = stmt.where(t.updated_at >= since)
+    rows = await db.stream_scalars(stmt)
+    return {hour_floor(ts) async for ts in rows if ts is not None}
+
+
+async def _build_hour(db: AsyncSession, bucket: datetime) -> dict[tuple, DDSketch]:
+    t = models.Transaction
+    end = bucket + timedelta(hours=1)
+    sketches: dict[tuple, DDSketch] = defaultdict(lambda: DDSketch(RELATIVE_ACCURACY))
+
+    # Zeit bis zum finalen Status
+    rows = await db.execute(
+        select(t.partner_id, t.message_type, t.created_at, t.updated_at).where(
+            t.created_at >= bucket, t.created_at < end
+        )
+    )
+    for partner_id, message_type, created, updated in rows:
+        if created and updated:
+            sketches[(partner_id, message_type, FINAL_STATUS)].add(
+                (updated - created).total_seconds()
+            )
+
+    # Antwortzeit DESADV nach dem jeweils letzten DELFOR desselben Partners
+    delfor = aliased(t)
+    prev_delfor = (
+        select(func.max(delfor.created_at))
+        .where(
+            delfor.partner_id == t.partner_id,
+            delfor.message_type == "DELFOR",
+            delfor.created_at <= t.created_at,
+        )
+        .scalar_subquery()
+    )
+    rows = await db.execute(
+        select(t.partner_id, t.created_at, prev_delfor).where(
+            t.message_type == "DESADV", t.created_at >= bucket, t.created_at < end
+        )
+    )
+    for partner_id, created, delfor_at in rows:
+        if delfor_at is not None:
+            sketches[(partner_id, "DESADV", DESADV_AFTER_DELFOR)].add(
+                (created - delfor_at).total_seconds()
+            )
+
+    return sketches
+
+
+# Refresh
+
+async def refresh_sketches(db: AsyncSession) -> int:
+    """
+    Baut alle Stunden-Buckets neu, in denen sich seit dem letzten Lauf
+    etwas geändert hat. Liefert die Anzahl neu gebauter Buckets.
+    """
+    global _last_refresh
+    started = datetime.utcnow()
+    state = await db.get(models.RollupState, ROLLUP_NAME)
+    since = None
+    if state:
+        # überlappende Fenster: spät committete Zeilen und nachgehende Ingest-Uhren
+        # werden so beim nächsten Lauf noch erfasst (Neubau einer Stunde ist idempotent)
+        since = state.watermark - timedelta(minutes=settings.latency_refresh_overlap_minutes)
+
+    hours = await _dirty_hours(db, since)
+    ls = models.LatencySketch
+    for bucket in sorted(hours):
+        sketches = await _build_hour(db, bucket)
+        await db.execute(delete(ls).where(ls.bucket_start == bucket))
+        db.add_all(
+            ls(
+                bucket_start=bucket,
+                partner_id=partner_id,
+                message_type=message_type,
+                metric=metric,
+                count=sk.count,
+                sketch=json.dumps(sk.to_dict()),
+                refreshed_at=started,
+            )
+            for (partner_id, message_type, metric), sk in sketches.items()
+        )
+        await db.commit()
+
+    # Wasserzeichen erst nach dem letzten Bucket – ein abgebrochener Lauf wird komplett wiederholt
+    if state is None:
+        db.add(models.RollupState(name=ROLLUP_NAME, watermark=started))
+    else:
+        state.watermark = started
+    await db.commit()
+
+    _last_refresh = started
+    return len(hours)
+
+
+async def _try_lock(conn: AsyncConnection) -> bool:
+    if conn.dialect.name != "mysql":
+        return True
+    got = await conn.scalar(text("SELECT GET_LOCK(:name, 0)"), {"name": LOCK_NAME})
+    # Lock gilt pro Verbindung, nicht pro Transaktion – die Session startet danach eine eigene
+    await conn.commit()
+    return got == 1
+
+
+async def _release_lock(conn: AsyncConnection) -> None:
+    if conn.dialect.name == "mysql":
+        await conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
+        await conn.commit()
+
+
+async def refresh_once(engine: AsyncEngine) -> int | None:
+    """
+    Ein Refresh-Lauf über alle Worker hinweg exklusiv (MySQL ``GET_LOCK``).
+    Hält ein anderer Worker den Lock, wird nur dessen Wasserzeichen für die
+    Lag-Anzeige übernommen und ``None`` geliefert.
+    """
+    global _last_refresh
+    async with engine.connect() as conn:
+        if not await _try_lock(conn):
+            async with AsyncSession(bind=conn) as db:
+                state = await db.get(models.RollupState, ROLLUP_NAME)
+                _last_refresh = state.watermark if state else None
+            return None
+        try:
+            async with AsyncSession(bind=conn, expire_on_commit=False) as db:
+                return await refresh_sketches(db)
+        finally:
+            await _release_lock(conn)
+
+
+async def run_refresher(engine: AsyncEngine, interval: float) -> None:
+    """Hintergrund-Task: hält die Sketches inkrementell aktuell."""
+    while True:
+        try:
+            n = await refresh_once(engine)
+            if n:
+                logger.info(f"latency sketches: {n} Stunden-Buckets aktualisiert")
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning(f"latency sketches: Refresh fehlgeschlagen ({exc!r})")
+        await asyncio.sleep(interval)
+
+
+# Abfrage
+
+async def load_percentiles(
+    db: AsyncSession, stmt, quantiles: tuple[float, ...]
+) -> list[tuple[int, str, str, int, list[float | None]]]:
+    """
+    Merged die per ``stmt`` selektierten Stunden-Sketches je
+    (partner_id, message_type, metric) und liefert die Quantile.
+    """
+    merged: dict[tuple, DDSketch] = {}
+    for row in (await db.execute(stmt)).scalars():
+        key = (row.partner_id, row.message_type, row.metric)
+        sk = DDSketch.from_dict(json.loads(row.sketch))
+        if key in merged:
+            merged[key].merge(sk)
+        else:
+            merged[key] = sk
+
+    return [
+        (*key, sk.count, [sk.quantile(q) for q in quantiles])
+        for key, sk in sorted(merged.items())
+    ]
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, Optional, Protocol
+
+from loguru import logger
+
+
+# Backends: liefern 0.0 wenn ein Token entnommen wurde, sonst die Wartezeit in Sekunden
+
+class BucketBackend(Protocol):
+    async def take(self, key: str, rate: float, burst: int) -> float: ...
+
+
+class InMemoryBackend:
+    """
+    Token-Bucket pro Key im Prozess. ``take`` enthält kein ``await`` und ist
+    damit in der Event-Loop atomar – ein Lock ist nicht nötig.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, max_keys: int = 10_000) -> None:
+        self.clock = clock
+        self.max_keys = max_keys
+        # key -> (tokens, timestamp, rate, burst); Reihenfolge = zuletzt benutzt am Ende (LRU)
+        self._buckets: dict[str, tuple[float, float, float, int]] = {}
+
+    def _prune(self, now: float) -> None:
+        # volle Buckets sind gleichwertig zu "nicht vorhanden" und können weg –
+        # geprüft mit rate/burst des jeweiligen Buckets, nicht des aufrufenden Limiters
+        full = [
+            k
+            for k, (tokens, ts, rate, burst) in self._buckets.items()
+            if tokens + (now - ts) * rate >= burst
+        ]
+        for k in full:
+            del self._buckets[k]
+        # immer noch zu viele Keys -> am längsten unbenutzte Einträge verwerfen
+        excess = len(self._buckets) - int(self.max_keys * 0.9)
+        for k in list(self._buckets)[: max(excess, 0)]:
+            del self._buckets[k]
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = self.clock()
+        entry = self._buckets.pop(key, None)
+        tokens, ts = (entry[0], entry[1]) if entry else (float(burst), now)
+        tokens = min(float(burst), tokens + (now - ts) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        # neu einfügen, damit der Key ans Ende der LRU-Reihenfolge wandert
+        self._buckets[key] = (tokens, now, rate, burst)
+        if len(self._buckets) > self.max_keys:
+            self._prune(now)
+        return wait
+
+
+_REDIS_TOKEN_BUCKET = """
+local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBackend:
+    """
+    Gemeinsamer Token-Bucket über alle Worker (optional, benötigt ``redis``).
+    Ist Redis nicht erreichbar, wird auf einen Bucket im Prozess ausgewichen.
+    """
+
+    def __init__(self, url: str, prefix: str = "edi:ratelimit:", cooldown: float = 5.0) -> None:
+        try:
+            from redis import asyncio as aioredis
+            from redis.exceptions import ConnectionError, TimeoutError
+        except ImportError as exc:  # optionale Abhängigkeit
+            raise RuntimeError("RATE_LIMIT_REDIS_URL gesetzt, aber 'redis' ist nicht installiert") from exc
+        self.redis = aioredis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.prefix = prefix
+        self._script = self.redis.register_script(_REDIS_TOKEN_BUCKET)
+        self._errors = (ConnectionError, TimeoutError)
+        self.fallback = InMemoryBackend()
+        self.cooldown = cooldown
+        self._down = False
+        self._retry_at = 0.0  # time.monotonic(), ab wann Redis wieder probiert wird
+        self._probing = False
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        # nach einem Fehler bis ``_retry_at`` direkt lokal antworten; danach prüft genau ein Request
+        if self._down and (self._probing or time.monotonic() < self._retry_at):
+            return await self.fallback.take(key, rate, burst)
+
+        self._probing = self._down
+        try:
+            wait = await self._script(keys=[self.prefix + key], args=[rate, burst, time.time()])
+        except self._errors as exc:
+            if not self._down:  # nur beim Übergang loggen, nicht pro Request
+                logger.warning(f"rate limit: Redis nicht erreichbar, nutze In-Process-Buckets ({exc!r})")
+                self._down = True
+            self._retry_at = time.monotonic() + self.cooldown
+            return await self.fallback.take(key, rate, burst)
+        finally:
+            self._probing = False
+
+        if self._down:
+            logger.info("rate limit: Redis wieder erreichbar")
+            self._down = False
+        return float(wait)
+
+
+# Limiter pro Endpoint-Klasse
+
+class Limiter:
+    """
+    Kombiniert Token-Bucket pro Client mit einer Obergrenze gleichzeitig
+    laufender Requests (pro Worker) für eine Endpoint-Klasse.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        backend: BucketBackend,
+        rate: float,
+        burst: int,
+        concurrency: int,
+    ) -> None:
+        self.name = name
+        self.backend = backend
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.in_flight = 0
+
+    async def acquire(self, client: str) -> Optional[float]:
+        """Liefert ``None`` bei Erfolg, sonst den ``Retry-After``-Wert in Sekunden."""
+        if self.in_flight >= self.concurrency:
+            return 1.0
+        wait = await self.backend.take(f"{self.name}:{client}", self.rate, self.burst)
+        if wait > 0:
+            return wait
+        # erneut prüfen – während ``take`` (Redis) können andere Requests gestartet sein
+        if self.in_flight >= self.concurrency:
+            return 1.0
+        self.in_flight += 1
+        return None
+
+    def release(self) -> None:
+        self.in_flight -= 1
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.schemas.health import CacheStatus, DatabaseStatus, PoolStatus, Readiness
+
+
+# Lag-Quellen (Rollups / Vorberechnungen melden hier ihren Rückstand in Sekunden)
+
+LagSource = Callable[[], Optional[float]]
+_lag_sources: dict[str, LagSource] = {}
+
+
+def register_lag_source(name: str, source: LagSource) -> None:
+    _lag_sources[name] = source
+
+
+def collect_lag() -> dict[str, float | None]:
+    lag: dict[str, float | None] = {}
+    for name, source in _lag_sources.items():
+        try:
+            lag[name] = source()
+        except Exception:  # eine defekte Quelle darf die Probe nicht kippen
+            lag[name] = None
+    return lag
+
+
+# Pool-Auslastung (rein aus den Pool-Zählern, ohne DB-Zugriff)
+
+def pool_status(engine: AsyncEngine) -> PoolStatus:
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        # NullPool / StaticPool führen keine Zähler
+        return PoolStatus()
+
+    size = pool.size()
+    checked_out = pool.checkedout()
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    saturation = None
+    if max_overflow >= 0 and size + max_overflow > 0:
+        saturation = round(checked_out / (size + max_overflow), 3)
+    return PoolStatus(
+        size=size,
+        checked_out=checked_out,
+        overflow=max(pool.overflow(), 0),
+        saturation=saturation,
+    )
+
+
+# Readiness-Probe
+
+class ReadinessProbe:
+    """
+    Prüft die DB per ``SELECT 1`` höchstens einmal pro ``ttl`` Sekunden.
+    Parallele Probes warten auf denselben Check, statt eigene Queries abzusetzen –
+    die DB-Last ist damit unabhängig von der Probe-Frequenz.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        ttl: float,
+        timeout: float,
+        saturation_max: float,
+    ) -> None:
+        self.engine = engine
+        self.ttl = ttl
+        self.timeout = timeout
+        self.saturation_max = saturation_max
+        self._lock = asyncio.Lock()
+        self._checked_at: float | None = None
+        self._db = DatabaseStatus(ok=False)
+
+    def _age(self) -> float | None:
+        if self._checked_at is None:
+            return None
+        return time.monotonic() - self._checked_at
+
+    def _fresh(self) -> bool:
+        age = self._age()
+        return age is not None and age < self.ttl
+
+    async def _select_one(self) -> None:
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def _ping(self) -> DatabaseStatus:
+        start = time.perf_counter()
+        try:
+            # Timeout deckt auch den Verbindungsaufbau ab
+            await asyncio.wait_for(self._select_one(), self.timeout)
+        except asyncio.TimeoutError:
+            return DatabaseStatus(ok=False, error=f"timeout after {self.timeout:.1f}s")
+        except Exception as exc:
+            return DatabaseStatus(ok=False, error=type(exc).__name__)
+        latency = (time.perf_counter() - start) * 1_000
+        return DatabaseStatus(ok=True, latency_ms=round(latency, 1))
+
+    async def check_db(self) -> tuple[DatabaseStatus, bool]:
+        """Liefert (DB-Status, Cache-Treffer)."""
+        if self._fresh():
+            return self._db, True
+        async with self._lock:
+            # ein anderer Request hat währenddessen evtl. schon geprüft
+            if self._fresh():
+                return self._db, True
+            self._db = await self._ping()
+            self._checked_at = time.monotonic()
+            return self._db, False
+
+    async def report(self) -> Readiness:
+        db, hit = await self.check_db()
+        pool = pool_status(self.engine)
+
+        ready = db.ok
+        if pool.saturation is not None and pool.saturation >= self.saturation_max:
+            ready = False
+
+        return Readiness(
+            status="ok" if ready else "unavailable",
+            database=db,
+            pool=pool,
+            cache=CacheStatus(
+                hit=hit,
+                age_seconds=round(self._age() or 0.0, 3),
+                ttl_seconds=self.ttl,
+            ),
+            lag_seconds=collect_lag(),
+        )
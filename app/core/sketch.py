@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import math
+from typing import Iterable
+
+
+class DDSketch:
+    """
+    Quantil-Sketch mit relativer Genauigkeit (DDSketch, Masson et al. 2019).
+
+    Werte landen in logarithmischen Buckets; zwei Sketches werden durch
+    Addition der Bucket-Zähler gemergt. Damit lassen sich stündliche Sketches
+    beliebig zu größeren Zeiträumen zusammenfassen, ohne Rohdaten zu sortieren.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy muss zwischen 0 und 1 liegen")
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    # Befüllen
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value: float, weight: int = 1) -> None:
+        # negative Latenzen (Uhrzeit-Drift) werden wie 0 behandelt
+        if value <= 1e-9:
+            self.zero_count += weight
+        else:
+            key = self._key(value)
+            self.bins[key] = self.bins.get(key, 0) + weight
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+        self.count += weight
+
+    def extend(self, values: Iterable[float]) -> None:
+        for v in values:
+            self.add(v)
+
+    def _collapse(self) -> None:
+        # kleinste Buckets zusammenlegen – Genauigkeit bleibt für hohe Quantile erhalten
+        keys = sorted(self.bins)
+        surplus = keys[: len(keys) - self.max_bins + 1]
+        merged = sum(self.bins.pop(k) for k in surplus)
+        target = keys[len(surplus)]
+        self.bins[target] += merged
+
+    def merge(self, other: DDSketch) -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Sketches mit unterschiedlicher Genauigkeit sind nicht mergebar")
+        for key, n in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + n
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    # Auswerten
+
+    def quantile(self, q: float) -> float | None:
+        if not 0 <= q <= 1:
+            raise ValueError("q muss zwischen 0 und 1 liegen")
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                return 2 * self.gamma**key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    # Serialisierung (JSON-kompatibel für die DB)
+
+    def to_dict(self) -> dict:
+        return {
+            "alpha": self.relative_accuracy,
+            "zero": self.zero_count,
+            "bins": {str(k): n for k, n in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> DDSketch:
+        sketch = cls(relative_accuracy=data["alpha"])
+        sketch.zero_count = data["zero"]
+        sketch.bins = {int(k): n for k, n in data["bins"].items()}
+        sketch.count = sketch.zero_count + sum(sketch.bins.values())
+        return sketch
@@ -6,9 +6,11 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import Mapped, declarative_base, mapped_column, relationship
 
@@ -38,6 +40,14 @@ class StatusCode(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Suche: Präfix auf Referenznummer, Volltext auf Fehlermeldung
+        Index("ix_transactions_reference_number", "reference_number"),
+        Index("ix_transactions_partner_created", "partner_id", "created_at"),
+        Index("ft_transactions_error_message", "error_message", mysql_prefix="FULLTEXT"),
+        # inkrementeller Refresh der Latenz-Sketches sucht geänderte Zeilen
+        Index("ix_transactions_updated_at", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     reference_number: Mapped[str] = mapped_column(String(100))
@@ -60,6 +70,32 @@ class Transaction(Base):
     status_code: Mapped["StatusCode"] = relationship()
 
 
+# ------------------------  Latenz-Sketches (Stunden-Rollup)  -------------- #
+class LatencySketch(Base):
+    __tablename__ = "latency_sketches"
+    __table_args__ = (
+        UniqueConstraint("bucket_start", "partner_id", "message_type", "metric"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, index=True)
+    partner_id: Mapped[int] = mapped_column(ForeignKey("partners.id"))
+    message_type: Mapped[str] = mapped_column(String(20))
+    metric: Mapped[str] = mapped_column(String(30))
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    sketch: Mapped[str] = mapped_column(Text, nullable=False)  # DDSketch als JSON
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class RollupState(Base):
+    """Wasserzeichen je Rollup – wird erst nach einem vollständigen Lauf geschrieben."""
+
+    __tablename__ = "rollup_state"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    watermark: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
 # ------------------------  Auth / JWT  ------------------------------------ #
 class User(Base):
     __tablename__ = "users"
@@ -18,6 +18,7 @@ from app.api.endpoints import (
     kpis,
     status_codes,
 )
+from app.core import latency
 from app.core.config import settings
 from app.db import models
 from app.db.session import engine
@@ -63,6 +64,24 @@ async def _bootstrap() -> None:
 async def init_db():
     await _bootstrap()
 
+
+# Latenz-Sketches inkrementell im Hintergrund pflegen (pro Lauf nur ein Worker, via GET_LOCK)
+_background_tasks: set[asyncio.Task] = set()
+
+
+@app.on_event("startup")
+async def start_latency_refresher():
+    task = asyncio.create_task(
+        latency.run_refresher(engine, settings.latency_refresh_interval)
+    )
+    _background_tasks.add(task)
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in _background_tasks:
+        task.cancel()
+
 #asyncio.get_event_loop().run_until_complete(_bootstrap())
 
 # Globaler API‑Router  (/api …)
@@ -71,16 +90,19 @@ api_router = APIRouter(prefix="/api")
 # Öffentliche Route
 api_router.include_router(health.router)
 
-# Geschützte Routen (API‑Key oder JWT notwendig)
+# Geschützte Routen (API‑Key oder JWT notwendig) + Rate-Limit-Klasse
 secured_routers = [
-    partners.router,
-    transactions.router,
-    kpis.router,
-    status_codes.router,
-    auth.router,
+    (partners.router, "cheap"),
+    (transactions.router, "bulk"),
+    (kpis.router, "kpi"),
+    (status_codes.router, "cheap"),
+    (auth.router, "cheap"),
 ]
-for r in secured_routers:
-    api_router.include_router(r, dependencies=[Depends(deps.verify_api_key)])
+for r, limit_class in secured_routers:
+    api_router.include_router(
+        r,
+        dependencies=[Depends(deps.verify_api_key), Depends(deps.rate_limit(limit_class))],
+    )
 
 app.include_router(api_router)
 
@@ -0,0 +1,29 @@
+from typing import Dict, Optional
+from pydantic import BaseModel
+
+
+class DatabaseStatus(BaseModel):
+    ok: bool
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+class PoolStatus(BaseModel):
+    size: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    saturation: Optional[float] = None
+
+
+class CacheStatus(BaseModel):
+    hit: bool
+    age_seconds: float
+    ttl_seconds: float
+
+
+class Readiness(BaseModel):
+    status: str
+    database: DatabaseStatus
+    pool: PoolStatus
+    cache: CacheStatus
+    lag_seconds: Dict[str, Optional[float]] = {}
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -12,3 +12,15 @@ class KPI(BaseModel):
     data: List[KPIEntry]
     period_start: datetime
     period_end: datetime
+
+
+class LatencyKPI(BaseModel):
+    partner_id: int
+    message_type: str
+    metric: str
+    count: int
+    p50: Optional[float]  # Sekunden
+    p95: Optional[float]
+    p99: Optional[float]
+    period_start: datetime
+    period_end: datetime
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.api.endpoints import health
+from app.core import readiness
+from app.core.readiness import ReadinessProbe, register_lag_source
+
+
+class _Conn:
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt):
+        self.engine.queries += 1
+        await asyncio.sleep(0.01)
+        if self.engine.fail:
+            raise ConnectionError("db down")
+
+
+class _Pool:
+    _max_overflow = 5
+
+    def __init__(self, checked_out):
+        self._checked_out = checked_out
+
+    def size(self):
+        return 5
+
+    def checkedout(self):
+        return self._checked_out
+
+    def overflow(self):
+        return self._checked_out - 5
+
+
+class _Engine:
+    pool = object()
+
+    def __init__(self, fail=False, pool=None):
+        self.queries = 0
+        self.fail = fail
+        if pool is not None:
+            self.pool = pool
+
+    def connect(self):
+        return _Conn(self)
+
+
+@pytest.mark.asyncio
+async def test_ready_probe_is_cached():
+    engine = _Engine()
+    probe = ReadinessProbe(engine, ttl=60, timeout=1, saturation_max=0.9)
+    reports = await asyncio.gather(*(probe.report() for _ in range(20)))
+    assert engine.queries == 1
+    assert all(r.status == "ok" for r in reports)
+    assert (await probe.report()).cache.hit
+
+
+@pytest.mark.asyncio
+async def test_ready_probe_db_down():
+    engine = _Engine(fail=True)
+    probe = ReadinessProbe(engine, ttl=60, timeout=1, saturation_max=0.9)
+    report = await probe.report()
+    assert report.status == "unavailable"
+    assert report.database.error == "ConnectionError"
+    await probe.report()
+    assert engine.queries == 1
+
+
+@pytest.mark.asyncio
+async def test_ready_probe_reports_lag():
+    register_lag_source("test", lambda: 12.5)
+    probe = ReadinessProbe(_Engine(), ttl=60, timeout=1, saturation_max=0.9)
+    report = await probe.report()
+    readiness._lag_sources.pop("test")
+    assert report.lag_seconds["test"] == 12.5
+
+
+@pytest.mark.asyncio
+async def test_ready_probe_pool_saturated():
+    probe = ReadinessProbe(_Engine(pool=_Pool(checked_out=9)), ttl=60, timeout=1, saturation_max=0.9)
+    report = await probe.report()
+    assert report.database.ok
+    assert report.pool.saturation == 0.9
+    assert report.pool.overflow == 4
+    assert report.status == "unavailable"
+
+    probe = ReadinessProbe(_Engine(pool=_Pool(checked_out=3)), ttl=60, timeout=1, saturation_max=0.9)
+    assert (await probe.report()).status == "ok"
+
+
+@pytest.mark.asyncio
+async def test_ready_endpoint_answers_503(monkeypatch):
+    from app.main import app
+
+    probe = ReadinessProbe(_Engine(fail=True), ttl=60, timeout=1, saturation_max=0.9)
+    monkeypatch.setattr(health, "probe", probe)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        ready = await ac.get("/api/health/ready")
+        live = await ac.get("/api/health/live")
+    assert ready.status_code == 503
+    assert ready.json()["status"] == "unavailable"
+    assert live.status_code == 200
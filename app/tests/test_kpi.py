@@ -15,3 +15,9 @@ async def test_empty_kpi():
         r = await ac.get("/kpi/partner", headers=headers)
     assert r.status_code == 200
     assert r.json() == []
+
+@pytest.mark.asyncio
+async def test_latency_rejects_unknown_metric():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        r = await ac.get("/api/kpi/latency?metric=bogus", headers=headers)
+    assert r.status_code == 422
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.api.endpoints.kpis import kpi_latency
+from app.core import latency
+from app.db import models
+
+BASE = latency.hour_floor(datetime.utcnow() - timedelta(hours=6))
+
+
+def _tx(partner_id, message_type, created, updated=None):
+    return models.Transaction(
+        reference_number=f"{message_type}-{created:%H%M%S}",
+        content="x",
+        message_type=message_type,
+        direction="INBOUND",
+        status=40,
+        partner_id=partner_id,
+        created_at=created,
+        updated_at=updated or created,
+    )
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    eng = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'latency.db'}")
+    async with eng.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+
+    async with AsyncSession(eng) as db:
+        db.add_all([
+            models.Partner(id=1, name="BMW", identifier="BMW01"),
+            models.Partner(id=2, name="Audi", identifier="AUDI01"),
+            models.StatusCode(code=40, description="OK"),
+        ])
+        # 5 Stunden, je 10 DELFOR + DESADV; DESADV folgt nach 10..100 s
+        for h in range(5):
+            for i in range(10):
+                delfor_at = BASE + timedelta(hours=h, minutes=5 * i)
+                desadv_at = delfor_at + timedelta(seconds=10 * (i + 1))
+                db.add(_tx(1, "DELFOR", delfor_at, delfor_at + timedelta(seconds=i + 1)))
+                db.add(_tx(1, "DESADV", desadv_at, desadv_at + timedelta(seconds=60)))
+        # Partner 2: DESADV ohne vorherigen DELFOR
+        db.add(_tx(2, "DESADV", BASE + timedelta(minutes=1), BASE + timedelta(minutes=3)))
+        await db.commit()
+
+    latency._last_refresh = None
+    yield eng
+    await eng.dispose()
+
+
+async def _latency(db, metric, **filters):
+    params = dict(
+        message_type=None, partner_id=None, partner_name=None, partner_identifier=None,
+        start_date=BASE - timedelta(hours=1), end_date=datetime.utcnow(),
+    )
+    params.update(filters)
+    return await kpi_latency(metric=metric, db=db, **params)
+
+
+@pytest.mark.asyncio
+async def test_refresh_and_percentiles(engine):
+    assert await latency.refresh_once(engine) == 5
+    assert await latency.refresh_once(engine) == 0  # nichts geändert
+
+    async with AsyncSession(engine) as db:
+        # 5 Stunden-Sketches werden gemergt: 50 Werte 10..100 s
+        (row,) = await _latency(db, "desadv_after_delfor")
+        assert (row.partner_id, row.message_type, row.count) == (1, "DESADV", 50)
+        assert row.p50 == pytest.approx(50, rel=0.01)
+        assert row.p99 == pytest.approx(100, rel=0.01)
+
+        rows = await _latency(db, "final_status", partner_identifier="BMW01")
+        by_type = {r.message_type: r for r in rows}
+        assert set(by_type) == {"DELFOR", "DESADV"}
+        assert by_type["DESADV"].p50 == pytest.approx(60, rel=0.01)
+        assert by_type["DELFOR"].p99 == pytest.approx(10, rel=0.01)
+
+        (row,) = await _latency(db, "final_status", partner_id=2)
+        assert (row.count, row.p50) == (1, pytest.approx(120, rel=0.01))
+
+        # nur die erste Stunde
+        rows = await _latency(
+            db, "desadv_after_delfor", end_date=BASE + timedelta(minutes=30)
+        )
+        assert rows[0].count == 10
+
+
+@pytest.mark.asyncio
+async def test_failed_run_keeps_watermark(engine, monkeypatch):
+    await latency.refresh_once(engine)
+    async with AsyncSession(engine) as db:
+        watermark = (await db.get(models.RollupState, latency.ROLLUP_NAME)).watermark
+        now = datetime.utcnow()
+        db.add(_tx(1, "DELFOR", now - timedelta(hours=2), now))
+        db.add(_tx(1, "DELFOR", now, now))
+        await db.commit()
+
+    calls = []
+    build_hour = latency._build_hour
+
+    async def failing(db, bucket):
+        calls.append(bucket)
+        if len(calls) == 2:
+            raise RuntimeError("abgebrochen")
+        return await build_hour(db, bucket)
+
+    monkeypatch.setattr(latency, "_build_hour", failing)
+    with pytest.raises(RuntimeError):
+        await latency.refresh_once(engine)
+
+    async with AsyncSession(engine) as db:
+        state = await db.get(models.RollupState, latency.ROLLUP_NAME)
+        assert state.watermark == watermark
+
+    # nächster Lauf baut beide Stunden (auch die bereits geschriebene) neu
+    monkeypatch.setattr(latency, "_build_hour", build_hour)
+    assert await latency.refresh_once(engine) == 2
+
+
+@pytest.mark.asyncio
+async def test_late_commit_inside_overlap_is_picked_up(engine):
+    await latency.refresh_once(engine)
+    async with AsyncSession(engine) as db:
+        watermark = (await db.get(models.RollupState, latency.ROLLUP_NAME)).watermark
+        # vor dem Wasserzeichen gestempelt, aber erst danach committet
+        late = watermark - timedelta(minutes=2)
+        db.add(_tx(2, "DELFOR", BASE + timedelta(hours=3), late))
+        await db.commit()
+
+    assert await latency.refresh_once(engine) >= 1
+    async with AsyncSession(engine) as db:
+        rows = (await db.scalars(select(models.LatencySketch).where(
+            models.LatencySketch.partner_id == 2,
+            models.LatencySketch.message_type == "DELFOR",
+        ))).all()
+    assert [r.bucket_start for r in rows] == [BASE + timedelta(hours=3)]
@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.api import deps
+from app.core.ratelimit import InMemoryBackend, Limiter
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_burst_and_refill():
+    clock = _Clock()
+    backend = InMemoryBackend(clock=clock)
+    for _ in range(3):
+        assert await backend.take("a", rate=1, burst=3) == 0
+    assert await backend.take("a", rate=1, burst=3) == pytest.approx(1.0)
+    # anderer Client hat eigenen Bucket
+    assert await backend.take("b", rate=1, burst=3) == 0
+    clock.now = 1.0
+    assert await backend.take("a", rate=1, burst=3) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    limiter = Limiter("t", InMemoryBackend(), rate=100, burst=100, concurrency=2)
+    assert await limiter.acquire("a") is None
+    assert await limiter.acquire("b") is None
+    assert await limiter.acquire("c") == 1.0
+    limiter.release()
+    assert await limiter.acquire("c") is None
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_answers_429():
+    deps.limiters["test"] = Limiter("test", InMemoryBackend(), rate=0.1, burst=2, concurrency=5)
+    app = FastAPI()
+
+    @app.get("/x", dependencies=[Depends(deps.rate_limit("test"))])
+    async def x():
+        return {}
+
+    headers = {"X-API-Key": "supersecret"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        codes = [(await ac.get("/x", headers=headers)).status_code for _ in range(2)]
+        r = await ac.get("/x", headers=headers)
+        other = await ac.get("/x", headers={"X-API-Key": "other"})
+    del deps.limiters["test"]
+
+    assert codes == [200, 200]
+    assert r.status_code == 429
+    assert r.headers["Retry-After"] == "10"
+    assert other.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_prune_keeps_partial_buckets_of_other_classes():
+    clock = _Clock()
+    backend = InMemoryBackend(clock=clock, max_keys=3)
+    for _ in range(54):
+        await backend.take("cheap:a", rate=1, burst=60)
+    await backend.take("bulk:old", rate=1, burst=5)
+    await backend.take("bulk:b", rate=1, burst=5)
+    # cheap:a erneut benutzt -> bulk:old ist der am längsten unbenutzte Key
+    await backend.take("cheap:a", rate=1, burst=60)
+    await backend.take("bulk:c", rate=1, burst=5)  # löst Pruning aus
+
+    assert "bulk:old" not in backend._buckets
+    assert backend._buckets["cheap:a"][0] == 5  # für bulk (burst 5) wäre er "voll"
+
+
+@pytest.mark.asyncio
+async def test_redis_down_falls_back_to_in_process():
+    pytest.importorskip("redis")
+    from app.core.ratelimit import RedisBackend
+
+    backend = RedisBackend("redis://127.0.0.1:1")  # nicht erreichbar
+    waits = [await backend.take("k", rate=1, burst=2) for _ in range(3)]
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] > 0
+
+
+@pytest.mark.asyncio
+async def test_redis_hanging_uses_cooldown():
+    pytest.importorskip("redis")
+    from app.core.ratelimit import RedisBackend
+
+    # nimmt Verbindungen an, antwortet aber nie
+    writers = []
+
+    async def hang(reader, writer):
+        writers.append(writer)
+
+    server = await asyncio.start_server(hang, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    backend = RedisBackend(f"redis://127.0.0.1:{port}", cooldown=60)
+    try:
+        start = time.perf_counter()
+        assert await backend.take("k", rate=1, burst=5) == 0.0
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(3):
+            assert await backend.take("k", rate=1, burst=5) == 0.0
+        rest = time.perf_counter() - start
+
+        # Cooldown abgelaufen -> Redis wird erneut probiert (und hängt wieder)
+        backend._retry_at = 0.0
+        start = time.perf_counter()
+        await backend.take("k", rate=1, burst=5)
+        probe = time.perf_counter() - start
+    finally:
+        for w in writers:
+            w.close()
+        server.close()
+
+    assert first >= 0.4
+    assert rest < 0.05
+    assert probe >= 0.4
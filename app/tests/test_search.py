@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import mysql
+from sqlalchemy.exc import OperationalError
+
+from app.api.endpoints.transactions import build_search, fulltext_query, search_transactions
+from app.core.config import settings
+
+
+def _sql(stmt):
+    return str(stmt.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_fulltext_query_strips_operators():
+    assert fulltext_query('timeout -"AS2" >partner*') == "+timeout* +AS2* +partner*"
+    assert fulltext_query("--") == ""
+
+
+def test_search_reference_prefix_only():
+    sql = _sql(build_search("AB_1%", "reference", 3, None, None, 50, 0, 2000))
+    # %-Zeichen erscheinen im kompilierten SQL (pyformat) verdoppelt
+    assert "LIKE 'AB/_1/%%%%' ESCAPE '/'" in sql
+    assert "MATCH" not in sql
+    assert "MAX_EXECUTION_TIME(2000)" in sql
+    assert "LIMIT 0, 50" in sql
+
+
+def test_search_all_fields_uses_union():
+    sql = _sql(build_search("lieferschein fehlt", "all", None, None, None, 20, 40, 500))
+    assert "UNION" in sql
+    assert "AGAINST ('+lieferschein* +fehlt*' IN BOOLEAN MODE)" in sql
+    assert "LIMIT 40, 20" in sql
+
+
+def test_search_without_terms():
+    assert build_search("--", "error", None, None, None, 50, 0, 2000) is None
+
+
+class _Session:
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+
+    async def execute(self, stmt):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return _Result()
+
+
+class _Result:
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+
+async def _search(db):
+    return await search_transactions(
+        q="4711", field="all", partner_id=None, start_date=None, end_date=None,
+        limit=50, offset=0, db=db,
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_exceeds_budget(monkeypatch):
+    monkeypatch.setattr(settings, "search_time_budget_ms", 10)
+    with pytest.raises(HTTPException) as exc:
+        await _search(_Session(delay=2))
+    assert exc.value.status_code == 504
+
+
+@pytest.mark.asyncio
+async def test_search_mysql_query_interrupted():
+    err = OperationalError("SELECT", {}, Exception(3024, "Query execution was interrupted"))
+    with pytest.raises(HTTPException) as exc:
+        await _search(_Session(error=err))
+    assert exc.value.status_code == 504
+
+
+@pytest.mark.asyncio
+async def test_search_other_db_errors_propagate():
+    err = OperationalError("SELECT", {}, Exception(2013, "Lost connection"))
+    with pytest.raises(OperationalError):
+        await _search(_Session(error=err))
@@ -0,0 +1,42 @@
+import random
+
+from app.core.sketch import DDSketch
+
+
+def _exact(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))]
+
+
+def test_sketch_relative_accuracy():
+    rnd = random.Random(42)
+    values = [rnd.lognormvariate(3, 1.5) for _ in range(10_000)]
+    sk = DDSketch(relative_accuracy=0.01)
+    sk.extend(values)
+    for q in (0.5, 0.95, 0.99):
+        exact = _exact(values, q)
+        assert abs(sk.quantile(q) - exact) <= 0.011 * exact
+
+
+def test_sketch_merge_equals_single():
+    rnd = random.Random(7)
+    values = [rnd.expovariate(0.01) for _ in range(5_000)]
+    whole = DDSketch()
+    whole.extend(values)
+
+    merged = DDSketch()
+    for i in range(0, len(values), 500):  # z. B. ein Sketch pro Stunde
+        part = DDSketch()
+        part.extend(values[i : i + 500])
+        merged.merge(DDSketch.from_dict(part.to_dict()))
+
+    assert merged.count == whole.count
+    for q in (0.5, 0.95, 0.99):
+        assert merged.quantile(q) == whole.quantile(q)
+
+
+def test_sketch_zero_and_empty():
+    sk = DDSketch()
+    assert sk.quantile(0.5) is None
+    sk.extend([0, 0, 0, 10])
+    assert sk.quantile(0.5) == 0.0
@@ -0,0 +1,64 @@
+"""
+Overhead des Rate-Limiters pro Request messen.
+
+    PYTHONPATH=./ python benchmarks/bench_ratelimit.py
+"""
+import asyncio
+import time
+from datetime import timedelta
+
+from starlette.requests import Request
+
+from app.api import deps
+from app.api.auth import create_access_token
+from app.core.ratelimit import InMemoryBackend, Limiter
+
+N = 100_000
+
+
+def _request(headers: dict[str, str]) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+            "client": ("127.0.0.1", 1234),
+        }
+    )
+
+
+async def _bench(label: str, fn) -> None:
+    start = time.perf_counter()
+    for _ in range(N):
+        await fn()
+    per_op = (time.perf_counter() - start) / N * 1e6
+    print(f"{label:<38} {per_op:8.2f} µs/op")
+
+
+async def main() -> None:
+    backend = InMemoryBackend()
+    limiter = Limiter("bench", backend, rate=1e9, burst=10**9, concurrency=10)
+    key_req = _request({"X-API-Key": "supersecret"})
+    token = create_access_token({"sub": "demo"}, timedelta(minutes=5))
+    jwt_req = _request({"Authorization": f"Bearer {token}"})
+
+    async def take():
+        await backend.take("k", 1e9, 10**9)
+
+    async def client_key():
+        deps.client_id(key_req)
+
+    async def client_jwt():
+        deps.client_id(jwt_req)
+
+    async def acquire_release():
+        await limiter.acquire(deps.client_id(key_req))
+        limiter.release()
+
+    await _bench("InMemoryBackend.take", take)
+    await _bench("client_id (API-Key)", client_key)
+    await _bench("client_id (JWT)", client_jwt)
+    await _bench("acquire + release (API-Key)", acquire_release)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,56 @@
+"""transaction search indexes
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_indexes() -> set[str] | None:
+    """
+    Vorhandene Indizes auf ``transactions`` – ``None`` wenn die Tabelle noch fehlt.
+    Tabellen werden beim Serverstart per create_all angelegt, inkl. der Indizes aus dem Modell.
+    """
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("transactions"):
+        return None
+    return {ix["name"] for ix in inspector.get_indexes("transactions")}
+
+
+def upgrade() -> None:
+    existing = _existing_indexes()
+    if existing is None:
+        return
+    if "ix_transactions_reference_number" not in existing:
+        op.create_index("ix_transactions_reference_number", "transactions", ["reference_number"])
+    if "ix_transactions_partner_created" not in existing:
+        op.create_index("ix_transactions_partner_created", "transactions", ["partner_id", "created_at"])
+    if "ft_transactions_error_message" not in existing:
+        op.create_index(
+            "ft_transactions_error_message", "transactions", ["error_message"], mysql_prefix="FULLTEXT"
+        )
+
+
+def downgrade() -> None:
+    existing = _existing_indexes()
+    if existing is None:
+        return
+    for name in (
+        "ft_transactions_error_message",
+        "ix_transactions_partner_created",
+        "ix_transactions_reference_number",
+    ):
+        if name in existing:
+            op.drop_index(name, table_name="transactions")
@@ -0,0 +1,38 @@
+"""transaction updated_at index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 15:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_indexes() -> set[str] | None:
+    # fehlt die Tabelle noch, legt create_all sie samt Modell-Indizes an
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("transactions"):
+        return None
+    return {ix["name"] for ix in inspector.get_indexes("transactions")}
+
+
+def upgrade() -> None:
+    existing = _existing_indexes()
+    if existing is not None and "ix_transactions_updated_at" not in existing:
+        op.create_index("ix_transactions_updated_at", "transactions", ["updated_at"])
+
+
+def downgrade() -> None:
+    existing = _existing_indexes()
+    if existing is not None and "ix_transactions_updated_at" in existing:
+        op.drop_index("ix_transactions_updated_at", table_name="transactions")